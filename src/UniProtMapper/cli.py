@@ -1,37 +1,116 @@
 """Module contains the implementation of the command-line interface"""
 
 import argparse
-import csv
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from functools import lru_cache
 from io import StringIO
-from itertools import cycle
 from pathlib import Path
+from typing import Tuple
+
+import pandas as pd
 
 from .idmapping_api import ProtMapper
+from .utils import divide_batches
 
 CROSSREF_PATH = Path(__file__).parent / "resources/uniprot_mapping_dbs.json"
 FIELDS_CONFIG_PATH = Path(__file__).parent / "resources/cli_return_fields.txt"
-
-
-def print_colored_csv(csv_io):
-    """Function to make a colored output of a csv file. Source for the color codes:
-    https://www.kaggle.com/discussions/general/273188"""
-
-    # codes for red, green, yellow, blue, cyan, white
-    color_codes = [31, 32, 33, 34, 36, 37]
-    color_iterator = cycle(color_codes)
-
-    csv_io.seek(0)  # Ensure you're at the start of the StringIO object
-    reader = csv.reader(csv_io)
-    for row in reader:
-        for i, col in enumerate(row):
-            color_code = next(color_iterator)
-            if i < len(row) - 1:  # not the last column
-                print(f"\033[1;{color_code};40m{col}\033[1;37;40m,", end="")
-            else:  # last column, don't print comma after
-                print(f"\033[1;{color_code};40m{col}", end=" ")
-        print("\033[0m")  # reset color
-        color_iterator = cycle(color_codes)  # reset colors for each row
+MAX_WORKERS = 4  # number of 500-ID batches submitted to the API concurrently
+
+# ANSI prefixes for red, green, yellow, blue, cyan, white. Source for the color codes:
+# https://www.kaggle.com/discussions/general/273188
+_COLOR_PREFIXES = tuple(f"\033[1;{code};40m" for code in (31, 32, 33, 34, 36, 37))
+_SEPARATOR = "\033[1;37;40m,"
+_RESET = "\033[0m\n"
+
+
+@lru_cache(maxsize=1)
+def _default_fields(config_path: str) -> Tuple[str, ...]:
+    """Read the default return fields from `config_path`, caching them so repeated
+    calls to `main` in the same process don't read the file again."""
+    return tuple(Path(config_path).read_text().splitlines())
+
+
+@lru_cache(maxsize=1)
+def _mapper() -> ProtMapper:
+    """ProtMapper shared across calls to `main`, reusing its session's connections."""
+    return ProtMapper(pooling_interval=5, total_retries=5, backoff_factor=0.5)
+
+
+def _table_rows(df) -> list:
+    """Return the header and the rows of `df` as lists of strings. Results from the API
+    are usually all strings without missing values, in which case the cells are used as
+    they are; otherwise the frame is converted, rendering missing values as empty
+    cells."""
+    header = df.columns.tolist()
+    infer_dtype = pd.api.types.infer_dtype
+    # `str`/`string` columns infer as "string" even when holding missing values
+    is_str = (infer_dtype(col, skipna=False) == "string" for _, col in df.items())
+    if all(is_str) and not df.isna().values.any():
+        return [header] + df.values.tolist()
+    return [header] + df.fillna("").astype(str).values.tolist()
+
+
+def print_colored_table(df):
+    """Function to make a colored, comma-separated output of a data frame. Rows are
+    taken straight from the data frame, without serializing it to csv and parsing it
+    back. Colors rotate through `_COLOR_PREFIXES`, restarting on each row.
+
+    On a terminal, lines are written encoded to the binary stdout buffer, replacing
+    characters the terminal's encoding can't represent with `?`. Redirected output
+    goes through the text stream, keeping its newline translation and encoding."""
+    n_colors = len(_COLOR_PREFIXES)
+    # all rows share the same width, so a single line template holds every color code
+    cells = (_COLOR_PREFIXES[i % n_colors] + "{}" for i in range(df.shape[1]))
+    # the last cell is followed by a space before resetting the color
+    template = (_SEPARATOR.join(cells) + " " if df.shape[1] else "") + _RESET
+    lines = (template.format(*row) for row in _table_rows(df))
+    stdout_buffer = getattr(sys.stdout, "buffer", None)
+    if stdout_buffer is None or not sys.stdout.isatty():
+        sys.stdout.writelines(lines)
+        sys.stdout.flush()
+        return
+    # the text layer flushes every line on terminals, so skip it and write the encoded
+    # lines to the binary buffer. Flush first so earlier prints come out before the table
+    encoding = sys.stdout.encoding or "utf-8"
+    sys.stdout.flush()
+    write = stdout_buffer.write
+    for line in lines:
+        write(line.encode(encoding, errors="replace"))
+    stdout_buffer.flush()
+
+
+def _get_concurrently(get_batch, batches) -> Tuple[pd.DataFrame, list]:
+    """Run `get_batch` on each of the ID `batches` in a thread pool, so that polling
+    for one job overlaps the others. Returns the concatenated results, in the order
+    of `batches`, and the IDs that failed across all of them.
+
+    The workers' progress messages would interleave, so they are held back and a
+    single summary is printed instead; they are only shown if a batch fails."""
+    # NOTE: the workers share the `requests.Session` of the cached `_mapper()`, which
+    # requests doesn't document as thread-safe
+    batch_log = StringIO()
+    ex = ThreadPoolExecutor(min(MAX_WORKERS, len(batches)))
+    futures = []
+    try:
+        with redirect_stdout(batch_log):
+            futures = [ex.submit(get_batch, batch) for batch in batches]
+            responses = [future.result() for future in futures]
+    except Exception:
+        sys.stdout.write(batch_log.getvalue())
+        raise
+    finally:
+        # drop the batches not yet started and don't wait for the running ones, so that
+        # e.g. Ctrl-C returns right away (`cancel_futures` requires Python >= 3.9). The
+        # interpreter still lets running batches finish before the process exits
+        for future in futures:
+            future.cancel()
+        ex.shutdown(wait=False)
+    result = pd.concat([df for df, _ in responses], ignore_index=True)
+    failed = [failed_id for _, batch_failed in responses for failed_id in batch_failed]
+    print(f"Fetched: {len(result)} / {len(result) + len(failed)}")
+    return result, failed
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -119,41 +198,41 @@ def parse_arguments() -> argparse.Namespace:
 
     if any(["--print-fields" in sys.argv, "-pf" in sys.argv]):
         print("Available return fields:")
-        result = ProtMapper().fields_table
-        csv_io = StringIO(result.to_csv(index=False))
-        print_colored_csv(csv_io)
+        print_colored_table(_mapper().fields_table)
         sys.exit()
 
     return parser.parse_args()
 
 
 def main():
-    with FIELDS_CONFIG_PATH.open("r") as f:
-        DEFAULT_FIELDS = f.read().splitlines()
-
     args = parse_arguments()
 
-    field_retriever = ProtMapper(
-        pooling_interval=5, total_retries=5, backoff_factor=0.5
-    )
+    field_retriever = _mapper()
     if args.default_fields:
-        args.return_fields = DEFAULT_FIELDS
-    result, failed = field_retriever.get(
-        args.ids, fields=args.return_fields, from_db=args.from_db, to_db=args.to_db
-    )
-    field_retriever.session.close()
+        args.return_fields = list(_default_fields(str(FIELDS_CONFIG_PATH)))
+
+    def _get_batch(batch):
+        return field_retriever.get(
+            batch, fields=args.return_fields, from_db=args.from_db, to_db=args.to_db
+        )
+
+    batches = divide_batches(args.ids)
+    if len(batches) > 1:
+        result, failed = _get_concurrently(_get_batch, batches)
+    else:  # a single job, whose progress messages are shown as they come
+        result, failed = _get_batch(args.ids)
     if failed:
         print(f"Failed to retrieve {len(failed)} IDs:\n {failed}")
 
     if args.output is not None:
         output_path = Path(args.output)
-        if output_path.exists():
-            if not args.overwrite:
-                raise FileExistsError(
-                    f"Input file {output_path} already exists. "
-                    "Use parameter --overwrite to overwrite it."
-                )
-        result.to_csv(args.output, index=False)
+        if output_path.exists() and not args.overwrite:
+            raise FileExistsError(
+                f"Input file {output_path} already exists. "
+                "Use parameter --overwrite to overwrite it."
+            )
+        # a 1MB write buffer keeps pandas' csv writer from flushing on every chunk
+        with output_path.open("w", buffering=1 << 20, newline="") as f:
+            result.to_csv(f, index=False)
     else:
-        csv_io = StringIO(result.to_csv(index=False))
-        print_colored_csv(csv_io)
+        print_colored_table(result)
@@ -231,7 +231,9 @@ class ProtMapper(BaseUniProt):
                 print_progress_batches(0, 500, retrieved, n_failed)
                 return df, failed_ids
 
-        if len(ids) > 500:  # The API only allows 500 ids per request
+        # The API only allows 500 ids per request. Batches are fetched sequentially here
+        # on purpose; the CLI submits its own 500-ID batches concurrently instead
+        if len(ids) > 500:
             batched_ids = divide_batches(ids)
             all_dfs = []
             failed_ids = []
@@ -3,6 +3,7 @@
 import json
 import re
 import zlib
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -60,6 +61,13 @@ def fetch_cross_referenced_db_details(
     return response.json()
 
 
+@lru_cache(maxsize=1)
+def _parse_fields_table() -> pd.DataFrame:
+    """Parse the fields table csv once per process; see `read_fields_table`."""
+    csv_path = get_resource_file("resources/uniprot_return_fields.csv")
+    return pd.read_csv(csv_path)
+
+
 def read_fields_table():
     """Return the fields table from the package resources as a DataFrame containing rows
     as the information available in UniProt and the following columns:
@@ -69,9 +77,11 @@ def read_fields_table():
     - `field_type`: the type of information, e.g.: sequence-related, function...
     - `has_full_version`: whether the annotated field contains the full version of the
     dataset or not (in case of cross-references).
-    - `type`: the type of data. Either "cross_reference" or "uniprot_field"."""
-    csv_path = get_resource_file("resources/uniprot_return_fields.csv")
-    return pd.read_csv(csv_path)
+    - `type`: the type of data. Either "cross_reference" or "uniprot_field".
+
+    The csv is only parsed on the first call; later calls return a copy of that
+    table."""
+    return _parse_fields_table().copy()
 
 
 def supported_mapping_dbs():
@@ -0,0 +1,205 @@
+import io
+import sys
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from UniProtMapper import ProtMapper
+from UniProtMapper.cli import main, print_colored_table
+from UniProtMapper.utils import print_progress_batches, read_fields_table
+
+RESOURCES = Path(__file__).parent / "resources"
+
+# ANSI codes as printed by the original csv-based implementation of the CLI output
+RED, GREEN, YELLOW, BLUE = (f"\033[1;{code};40m" for code in (31, 32, 33, 34))
+SEP = "\033[1;37;40m,"
+END = " \033[0m\n"
+
+SPECIAL_DF = pd.DataFrame(
+    {
+        "Entry": ["P30542", "Q16678"],
+        "Name": ["a, b", 'say "hi"'],
+        "Fmt": ["{0}", "{}x{"],
+        "Organism": ["Homo sapiens (Human)", "Café β-α"],
+    }
+)
+SPECIAL_EXPECTED = (
+    RED + "Entry" + SEP + GREEN + "Name" + SEP + YELLOW + "Fmt" + SEP + BLUE + "Organism" + END
+    + RED + "P30542" + SEP + GREEN + "a, b" + SEP + YELLOW + "{0}" + SEP + BLUE + "Homo sapiens (Human)" + END
+    + RED + "Q16678" + SEP + GREEN + 'say "hi"' + SEP + YELLOW + "{}x{" + SEP + BLUE + "Café β-α" + END
+)  # fmt: skip
+
+
+class TerminalWrapper(io.TextIOWrapper):
+    """Text stream over a binary buffer that reports itself as a terminal."""
+
+    def isatty(self):
+        return True
+
+
+def colored_output(df) -> str:
+    """Return what `print_colored_table` writes to a text-only stdout."""
+    stdout = io.StringIO()
+    with redirect_stdout(stdout):
+        print_colored_table(df)
+    return stdout.getvalue()
+
+
+class TestPrintColoredTable(unittest.TestCase):
+    def test_fields_table(self):
+        # golden file generated with the original csv-based implementation; it has to be
+        # regenerated whenever resources/uniprot_return_fields.csv changes
+        expected = (RESOURCES / "cli_fields_table_output.txt").read_text("utf-8")
+        self.assertEqual(colored_output(read_fields_table()), expected)
+
+    def test_special_characters(self):
+        # commas, quotes, format placeholders and non-ASCII text are printed verbatim
+        self.assertEqual(colored_output(SPECIAL_DF), SPECIAL_EXPECTED)
+
+    def test_mixed_types(self):
+        df = pd.DataFrame(
+            {
+                "ints": [1, 2, 3],
+                "floats": [0.5, np.nan, 2.0],
+                "objs": ["x", None, 3],
+                "strs": ["a", None, "c"],  # `str` dtype on pandas >= 3
+            }
+        )
+        expected = (
+            RED + "ints" + SEP + GREEN + "floats" + SEP + YELLOW + "objs" + SEP + BLUE + "strs" + END
+            + RED + "1" + SEP + GREEN + "0.5" + SEP + YELLOW + "x" + SEP + BLUE + "a" + END
+            + RED + "2" + SEP + GREEN + "" + SEP + YELLOW + "" + SEP + BLUE + "" + END
+            + RED + "3" + SEP + GREEN + "2.0" + SEP + YELLOW + "3" + SEP + BLUE + "c" + END
+        )  # fmt: skip
+        self.assertEqual(colored_output(df), expected)
+
+    def test_missing_strings(self):
+        # frames made only of strings still print missing values as empty cells
+        expected = (
+            RED + "a" + SEP + GREEN + "b" + END
+            + RED + "x" + SEP + GREEN + "y" + END
+            + RED + "" + SEP + GREEN + "z" + END
+        )  # fmt: skip
+        for dtype in (None, "string"):
+            df = pd.DataFrame({"a": ["x", None], "b": ["y", "z"]}, dtype=dtype)
+            self.assertEqual(colored_output(df), expected)
+
+    def test_empty_frames(self):
+        self.assertEqual(colored_output(pd.DataFrame()), "\033[0m\n")
+        self.assertEqual(
+            colored_output(pd.DataFrame(columns=["From", "Entry"])),
+            RED + "From" + SEP + GREEN + "Entry" + END,
+        )
+
+    def test_terminal_buffer(self):
+        # on a terminal the encoded lines are written to the binary buffer directly,
+        # after anything printed before the table; unencodable characters become "?"
+        stdout = TerminalWrapper(io.BytesIO(), encoding="cp1252", newline="\n")
+        with redirect_stdout(stdout):
+            print("before")
+            print_colored_table(SPECIAL_DF)
+        expected = ("before\n" + SPECIAL_EXPECTED).replace("β-α", "?-?")
+        self.assertEqual(stdout.buffer.getvalue(), expected.encode("cp1252"))
+
+    def test_redirected_newlines(self):
+        # redirected output keeps the text stream's newline translation, e.g. on Windows
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8", newline="\r\n")
+        with redirect_stdout(stdout):
+            print("before")
+            print_colored_table(SPECIAL_DF)
+        expected = ("before\n" + SPECIAL_EXPECTED).replace("\n", "\r\n")
+        self.assertEqual(stdout.buffer.getvalue(), expected.encode("utf-8"))
+
+
+def fake_get(self, ids, fields=None, from_db=None, to_db=None):
+    """Stand-in for `ProtMapper.get` mapping every ID but "BAD" to itself."""
+    mapped = [i for i in ids if i != "BAD"]
+    failed = [i for i in ids if i == "BAD"]
+    print_progress_batches(0, 500, len(mapped), len(failed))
+    return pd.DataFrame({"From": mapped, "Entry": mapped}), failed
+
+
+class TestMainBatches(unittest.TestCase):
+    def setUp(self):
+        # 1203 mappable IDs with an unmappable one in the second batch
+        self.good_ids = [f"P{i:05d}" for i in range(1203)]
+        self.ids = self.good_ids[:700] + ["BAD"] + self.good_ids[700:]
+        self.expected = pd.DataFrame({"From": self.good_ids, "Entry": self.good_ids})
+
+    def run_main(self, *extra_args, ids=None, get=fake_get):
+        argv = ["protmap", "-i", *(self.ids if ids is None else ids), *extra_args]
+        stdout = io.StringIO()
+        patch_get = mock.patch.object(ProtMapper, "get", autospec=True, side_effect=get)
+        with patch_get as get, mock.patch.object(sys, "argv", argv):
+            with redirect_stdout(stdout):
+                main()
+        return get, stdout.getvalue()
+
+    def test_batches_to_stdout(self):
+        with mock.patch("UniProtMapper.cli.print_colored_table") as print_table:
+            get, output = self.run_main()
+
+        # 500-ID batches, submitted once each
+        batches = sorted((call[0][1] for call in get.call_args_list), key=len)
+        self.assertEqual([len(batch) for batch in batches], [204, 500, 500])
+        self.assertCountEqual(sum(batches, []), self.ids)
+
+        # frames concatenated in input order with a fresh index
+        result = print_table.call_args[0][0]
+        pd.testing.assert_frame_equal(result, self.expected)
+
+        # failures from every batch are merged and progress is summarized once
+        self.assertIn("Failed to retrieve 1 IDs:\n ['BAD']", output)
+        self.assertEqual(output.count("Fetched:"), 1)
+        self.assertIn("Fetched: 1203 / 1204", output)
+
+    def test_single_batch(self):
+        # up to 500 IDs are fetched in one call, printing its own progress as it goes
+        def polling_get(self, ids, **kwargs):
+            print("Retrying in 5s")
+            return fake_get(self, ids, **kwargs)
+
+        with mock.patch("UniProtMapper.cli.print_colored_table") as print_table:
+            get, output = self.run_main(ids=self.ids[:500], get=polling_get)
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(get.call_args[0][1], self.ids[:500])
+        self.assertEqual(output, "Retrying in 5s\nFetched: 500 / 500\n")
+        self.assertEqual(len(print_table.call_args[0][0]), 500)
+
+    def test_interrupt_does_not_wait(self):
+        # Ctrl-C while other batches are still polling returns without waiting for them
+        started, release, finished = (threading.Event() for _ in range(3))
+
+        def interrupted_get(self, ids, **kwargs):
+            if ids[0] == "P00000":
+                started.wait(10)
+                raise KeyboardInterrupt
+            started.set()
+            release.wait(10)
+            finished.set()
+            return fake_get(self, ids, **kwargs)
+
+        try:
+            with self.assertRaises(KeyboardInterrupt):
+                self.run_main(get=interrupted_get)
+            self.assertFalse(finished.is_set())
+        finally:
+            release.set()
+
+    def test_batches_to_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path = Path(tmp_dir) / "result.csv"
+            self.run_main("-o", str(output_path))
+            with output_path.open("r", newline="") as f:
+                written = f.read()
+        self.assertEqual(written, self.expected.to_csv(index=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
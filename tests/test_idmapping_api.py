@@ -1,19 +1,28 @@
+import os
 import unittest
 
 import pandas as pd
 
 from UniProtMapper import ProtMapper
+from UniProtMapper.utils import read_fields_table
 
 # Test data
 test_ids = ["P30542", "Q16678", "Q02880"]
 
+# Tests querying the live UniProt API only run when UNIPROT_LIVE is set
+LIVE_API = os.environ.get("UNIPROT_LIVE")
+
 # Initialize the UniProtRetriever object
 mapper = ProtMapper()
 
 
 class TestProtMapper(unittest.TestCase):
-    def setUp(self):
-        self.fields_table = ProtMapper().fields_table
+    @classmethod
+    def setUpClass(cls):
+        cls.fields_table = mapper.fields_table
+        cls.label_map = dict(
+            zip(cls.fields_table["returned_field"], cls.fields_table["label"])
+        )
 
     def test_supported_dbs(self):
         supported_dbs = mapper._supported_dbs
@@ -24,12 +33,23 @@ class TestProtMapper(unittest.TestCase):
         self.assertIsInstance(self.fields_table, pd.DataFrame)
         self.assertIn("accession", self.fields_table["returned_field"].values)
 
+    def test_fields_table_copies(self):
+        # mutating a returned table must not leak into the cached one
+        expected = ProtMapper.fields_table.copy()
+        table = read_fields_table()
+        table.loc[0, "returned_field"] = "mutated"
+        table.drop(columns="label", inplace=True)
+        pd.testing.assert_frame_equal(read_fields_table(), expected)
+        pd.testing.assert_frame_equal(ProtMapper.fields_table, expected)
+
+    @unittest.skipUnless(LIVE_API, "set UNIPROT_LIVE to query the UniProt API")
     def test_retrieve_fields_default(self):
         result_df, failed = mapper.get(test_ids)
         self.assertIsInstance(result_df, pd.DataFrame)
         self.assertEqual(len(result_df), len(test_ids))
         self.assertEqual(len(failed), 0)
 
+    @unittest.skipUnless(LIVE_API, "set UNIPROT_LIVE to query the UniProt API")
     def test_retrieve_fields_custom(self):
         custom_fields = [
             "accession",
@@ -42,9 +62,7 @@ class TestProtMapper(unittest.TestCase):
             "gene_primary",
             "protein_families",
         ]
-        result_columns = self.fields_table[
-            self.fields_table["returned_field"].isin(custom_fields)
-        ]["label"]
+        result_columns = [self.label_map[field] for field in custom_fields]
         result_df, failed = mapper.get(test_ids, fields=custom_fields)
         self.assertIsInstance(result_df, pd.DataFrame)
         self.assertEqual(len(result_df), len(test_ids))
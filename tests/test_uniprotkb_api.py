@@ -1,3 +1,4 @@
+import os
 import unittest
 
 import pandas as pd
@@ -6,7 +7,11 @@ from UniProtMapper.uniprotkb_api import ProtKB
 from UniProtMapper.uniprotkb_fields import accession
 from UniProtMapper.utils import read_fields_table
 
+# Tests querying the live UniProt API only run when UNIPROT_LIVE is set
+LIVE_API = os.environ.get("UNIPROT_LIVE")
 
+
+@unittest.skipUnless(LIVE_API, "set UNIPROT_LIVE to query the UniProt API")
 class TestProtKB(unittest.TestCase):
     """Tests for the ProtKB class using baseline data from real API responses."""
 